@@ -0,0 +1,19 @@
+-- Migration script to wake outbox workers through LISTEN/NOTIFY
+-- Run this in your Supabase SQL editor after add_outbox_table.sql
+
+-- Fires once per inserting statement. Postgres delivers the notification
+-- only when the order transaction commits, and every backend worker process
+-- listening on "outbox" then drains new receipts right away instead of
+-- waiting for its next poll. Checkout makes no extra round trip.
+CREATE OR REPLACE FUNCTION public.notify_outbox() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS outbox_notify ON public.outbox;
+CREATE TRIGGER outbox_notify
+    AFTER INSERT ON public.outbox
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.notify_outbox();
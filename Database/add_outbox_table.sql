@@ -0,0 +1,30 @@
+-- Migration script to add the outbox table used for receipt emails
+-- Run this in your Supabase SQL editor
+
+-- Rows are inserted in the same transaction as the order and delivered
+-- later by the backend's outbox worker, so checkout never waits on SMTP.
+CREATE TABLE IF NOT EXISTS public.outbox (
+    outbox_id SERIAL PRIMARY KEY,
+    order_id INTEGER REFERENCES public.orders(order_id) ON DELETE SET NULL,
+    event_type VARCHAR NOT NULL,
+    recipient VARCHAR NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+    created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+    sent_at TIMESTAMP
+);
+
+-- The worker only ever scans due rows that are pending or whose
+-- "sending" lease has expired
+CREATE INDEX IF NOT EXISTS idx_outbox_pending_due
+    ON public.outbox(next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_outbox_order_id ON public.outbox(order_id);
+
+COMMENT ON TABLE public.outbox IS 'Pending notifications (receipt emails) sent asynchronously';
+COMMENT ON COLUMN public.outbox.payload IS 'Snapshot of the order used to render the message';
+COMMENT ON COLUMN public.outbox.status IS 'pending, sending (claimed by a worker), sent or failed';
+COMMENT ON COLUMN public.outbox.next_attempt_at IS 'Earliest time the next delivery attempt may run (lease expiry while sending)';
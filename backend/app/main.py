@@ -2,9 +2,17 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from .middleware import CompressionMiddleware
 
 # Import the route modules
 from .routes import order_router, order_item_router
+from .services import (
+    outbox_worker,
+    pg_listener,
+    OUTBOX_CHANNEL,
+    RECEIPT_EMAIL_ENABLED,
+)
+from .supabase import engine, background_engine
 
 
 app = FastAPI()
@@ -31,11 +39,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress list payloads for tablets on slow store Wi-Fi (br, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(order_item_router)
 app.include_router(order_router)
 
 
+@app.on_event("startup")
+async def start_background_workers():
+    if RECEIPT_EMAIL_ENABLED:
+        # Every worker process runs its own outbox worker; NOTIFY wakes them
+        # all and SKIP LOCKED makes sure only one delivers each receipt
+        pg_listener.subscribe(OUTBOX_CHANNEL, outbox_worker.wake)
+        await pg_listener.start()
+        await outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    # By now uvicorn has stopped accepting connections and let in-flight
+    # requests (e.g. order checkouts) finish, up to timeout_graceful_shutdown
+    await pg_listener.stop()
+    await outbox_worker.stop()
+    await engine.dispose()
+    await background_engine.dispose()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -0,0 +1,4 @@
+# Middleware package initialization file
+from .compression import CompressionMiddleware
+
+__all__ = ["CompressionMiddleware"]
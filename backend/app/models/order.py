@@ -1,4 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Text,
+    JSON,
+)
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -45,3 +54,21 @@ class OrderItem(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     category = Column(String)  # <-- Add this line
     order = relationship("Order", back_populates="order_items")
+
+
+class Outbox(Base):
+    """Deliveries written in the same transaction as an order and sent later
+    by the background worker in ``app.services.outbox``."""
+
+    __tablename__ = "outbox"
+    outbox_id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=True)
+    event_type = Column(String)  # e.g. "receipt_email"
+    recipient = Column(String)
+    payload = Column(JSON)
+    status = Column(String, default="pending")  # pending | sending | sent | failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-from app.supabase import supabase
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.order import OrderItem
+from app.supabase import supabase, get_db
+from app.services.order_totals import (
+    lock_order,
+    lock_order_for_item,
+    recalculate_order_totals,
+)
 
 router = APIRouter(prefix="/api/order-items", tags=["order-items"])
 
@@ -21,6 +29,14 @@ class OrderItemUpdate(BaseModel):
     total_price: Optional[float] = None
 
 
+class OrderTotals(BaseModel):
+    order_id: int
+    subtotal: float
+    discount: float
+    vat: float
+    total_amount: float
+
+
 class OrderItemResponse(BaseModel):
     order_item_id: int
     order_id: int
@@ -31,29 +47,50 @@ class OrderItemResponse(BaseModel):
     total_price: float
     created_at: datetime
     category: Optional[str] = None
+    # Parent order totals after a write, so the client needn't re-fetch them
+    order_totals: Optional[OrderTotals] = None
 
 
 @router.post("/", response_model=OrderItemResponse)
-async def create_order_item(item_data: OrderItemCreate):
+async def create_order_item(
+    item_data: OrderItemCreate, db: AsyncSession = Depends(get_db)
+):
     try:
-        item_insert = {
-            "order_id": item_data.order_id,
-            "item_name": item_data.item_name,
-            "price": item_data.unit_price,
-            "unit_price": item_data.unit_price,
-            "quantity": item_data.quantity,
-            "total_price": item_data.total_price,
-            "category": item_data.category,
-        }
-
-        result = supabase.table("order_items").insert(item_insert).execute()
+        # Serialize with other item writes on this order (see lock_order)
+        if not await lock_order(db, item_data.order_id):
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        result = await db.execute(
+            insert(OrderItem)
+            .values(
+                order_id=item_data.order_id,
+                item_name=item_data.item_name,
+                price=item_data.unit_price,
+                unit_price=item_data.unit_price,
+                quantity=item_data.quantity,
+                total_price=item_data.total_price,
+                category=item_data.category,
+            )
+            .returning(*OrderItem.__table__.c)
+        )
+        item = result.mappings().first()
 
-        if not result.data:
+        if not item:
             raise HTTPException(status_code=400, detail="Failed to create order item")
 
-        return result.data[0]
+        # Keep the parent order's totals in step, in the same transaction
+        response = dict(item)
+        response["order_totals"] = await recalculate_order_totals(
+            db, item["order_id"]
+        )
+        await db.commit()
+        return response
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail=f"Failed to create order item: {str(e)}"
         )
@@ -100,7 +137,9 @@ async def get_order_item(item_id: int):
 
 
 @router.put("/{item_id}", response_model=OrderItemResponse)
-async def update_order_item(item_id: int, item_data: OrderItemUpdate):
+async def update_order_item(
+    item_id: int, item_data: OrderItemUpdate, db: AsyncSession = Depends(get_db)
+):
     """Update an order item (typically quantity and total)"""
     try:
         # Prepare update data
@@ -109,58 +148,79 @@ async def update_order_item(item_id: int, item_data: OrderItemUpdate):
             update_data["quantity"] = item_data.quantity
         if item_data.total_price is not None:
             update_data["total_price"] = item_data.total_price
+        elif item_data.quantity is not None:
+            # Quantity changed without a new total: derive it from the unit price
+            update_data["total_price"] = OrderItem.unit_price * item_data.quantity
 
         if not update_data:
             raise HTTPException(status_code=400, detail="No data provided for update")
 
+        # Find and lock the parent order in one round trip (see lock_order)
+        if await lock_order_for_item(db, item_id) is None:
+            raise HTTPException(status_code=404, detail="Order item not found")
+
         # Update order item
-        result = (
-            supabase.table("order_items")
-            .update(update_data)
-            .eq("order_item_id", item_id)
-            .execute()
+        result = await db.execute(
+            update(OrderItem)
+            .where(OrderItem.order_item_id == item_id)
+            .values(**update_data)
+            .returning(*OrderItem.__table__.c)
+            .execution_options(synchronize_session=False)
         )
+        item = result.mappings().first()
 
-        if not result.data:
+        if not item:
             raise HTTPException(status_code=404, detail="Order item not found")
 
-        return result.data[0]
+        response = dict(item)
+        response["order_totals"] = await recalculate_order_totals(
+            db, item["order_id"]
+        )
+        await db.commit()
+        return response
 
     except HTTPException:
+        await db.rollback()
         raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail=f"Failed to update order item: {str(e)}"
         )
 
 
 @router.delete("/{item_id}")
-async def delete_order_item(item_id: int):
+async def delete_order_item(item_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        # Check if item exists
-        check_result = (
-            supabase.table("order_items")
-            .select("*")
-            .eq("order_item_id", item_id)
-            .execute()
+        # Find and lock the parent order in one round trip (see lock_order)
+        if await lock_order_for_item(db, item_id) is None:
+            raise HTTPException(status_code=404, detail="Order item not found")
+
+        # Delete and confirm the row was still there in one round trip
+        result = await db.execute(
+            delete(OrderItem)
+            .where(OrderItem.order_item_id == item_id)
+            .returning(OrderItem.order_id)
+            .execution_options(synchronize_session=False)
         )
 
-        if not check_result.data:
+        order_id = result.scalar_one_or_none()
+        if order_id is None:
             raise HTTPException(status_code=404, detail="Order item not found")
 
-        # Delete the item
-        result = (
-            supabase.table("order_items")
-            .delete()
-            .eq("order_item_id", item_id)
-            .execute()
-        )
+        order_totals = await recalculate_order_totals(db, order_id)
+        await db.commit()
 
-        return {"message": "Order item deleted successfully"}
+        return {
+            "message": "Order item deleted successfully",
+            "order_totals": order_totals,
+        }
 
     except HTTPException:
+        await db.rollback()
         raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail=f"Failed to delete order item: {str(e)}"
         )
@@ -6,7 +6,8 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from app.models.order import Order, OrderItem
 from app.supabase import get_db
-from typing import List
+from app.services.outbox import enqueue_receipt_email
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/orders-async", tags=["orders-async"])
 
@@ -44,6 +45,45 @@ class OrderCreate(BaseModel):
     order_items: List[OrderItemCreate]
 
 
+def _order_columns(fields: Optional[str]):
+    """Columns to SELECT for a ``fields=`` projection (comma separated).
+
+    Defaults to every column (also for a blank value); ``order_id`` is always
+    included so items can be attached to their order.
+    """
+    columns = Order.__table__.c
+    if not fields:
+        return list(columns)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        # Blank projection such as fields=" , " means no projection
+        return list(columns)
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown order fields: {', '.join(unknown)}"
+        )
+    if "order_id" not in names:
+        names.insert(0, "order_id")
+    return [columns[name] for name in dict.fromkeys(names)]
+
+
+async def _attach_order_items(db: AsyncSession, orders: List[dict]):
+    """Fetch items for all ``orders`` in one query and nest them in place"""
+    order_ids = [order["order_id"] for order in orders]
+    items_by_order = {order_id: [] for order_id in order_ids}
+    if order_ids:
+        items_result = await db.execute(
+            select(*OrderItem.__table__.c)
+            .where(OrderItem.order_id.in_(order_ids))
+            .order_by(OrderItem.order_item_id)
+        )
+        for item in items_result.mappings().all():
+            items_by_order[item["order_id"]].append(dict(item))
+    for order in orders:
+        order["order_items"] = items_by_order[order["order_id"]]
+
+
 @router.put("/{order_id}/status", response_model=dict)
 async def update_order_status_async(
     order_id: int, status_data: OrderStatusUpdate, db: AsyncSession = Depends(get_db)
@@ -121,6 +161,7 @@ async def create_order_async(
         )
         db.add(order)
         await db.flush()  # get order_id
+        items = []
         # Save order items for all orders except those with status 'canceled' or 'cancelled'
         if order_data.order_status.lower() not in ["canceled", "cancelled"]:
             items = [
@@ -136,6 +177,9 @@ async def create_order_async(
                 for item in order_data.order_items
             ]
             db.add_all(items)
+        # Receipt is queued in this transaction and sent by the outbox worker
+        if order_data.order_status == "completed":
+            enqueue_receipt_email(db, order, items)
         await db.commit()
         await db.refresh(order)
         return {"order_id": order.order_id}
@@ -146,29 +190,23 @@ async def create_order_async(
 
 
 @router.get("/status/held", response_model=List[dict])
-async def get_held_orders_async(db: AsyncSession = Depends(get_db)):
+async def get_held_orders_async(
+    fields: Optional[str] = None,
+    include_items: bool = True,
+    db: AsyncSession = Depends(get_db),
+):
     try:
         result = await db.execute(
-            select(Order)
+            select(*_order_columns(fields))
             .where(Order.order_status == "held")
             .order_by(Order.created_at.desc())
         )
-        orders = result.scalars().all()
-        held_orders = []
-        for order in orders:
-            # Fetch order items for each order
-            items_result = await db.execute(
-                select(OrderItem).where(OrderItem.order_id == order.order_id)
-            )
-            items = items_result.scalars().all()
-            order_dict = order.__dict__.copy()
-            order_dict["order_items"] = [item.__dict__.copy() for item in items]
-            # Remove SQLAlchemy state from dicts
-            order_dict.pop("_sa_instance_state", None)
-            for item in order_dict["order_items"]:
-                item.pop("_sa_instance_state", None)
-            held_orders.append(order_dict)
+        held_orders = [dict(row) for row in result.mappings().all()]
+        if include_items:
+            await _attach_order_items(db, held_orders)
         return held_orders
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch held orders: {str(e)}"
@@ -265,10 +303,12 @@ async def get_orders_async(
     offset: int = 0,
     date_from: str = None,
     date_to: str = None,
+    fields: Optional[str] = None,
+    include_items: bool = True,
     db: AsyncSession = Depends(get_db),
 ):
     try:
-        query = select(Order)
+        query = select(*_order_columns(fields))
         if status:
             query = query.where(Order.order_status == status)
         if date_from:
@@ -277,20 +317,12 @@ async def get_orders_async(
             query = query.where(Order.created_at <= date_to)
         query = query.order_by(Order.created_at.desc())
         result = await db.execute(query.offset(offset).limit(limit))
-        orders = result.scalars().all()
-        order_dicts = []
-        for order in orders:
-            items_result = await db.execute(
-                select(OrderItem).where(OrderItem.order_id == order.order_id)
-            )
-            items = items_result.scalars().all()
-            order_dict = order.__dict__.copy()
-            order_dict["order_items"] = [item.__dict__.copy() for item in items]
-            order_dict.pop("_sa_instance_state", None)
-            for item in order_dict["order_items"]:
-                item.pop("_sa_instance_state", None)
-            order_dicts.append(order_dict)
+        order_dicts = [dict(row) for row in result.mappings().all()]
+        if include_items:
+            await _attach_order_items(db, order_dicts)
         return order_dicts
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch orders: {str(e)}")
 
@@ -0,0 +1,37 @@
+"""Production entry point.
+
+    cd backend && WEB_CONCURRENCY=4 python -m app.serve
+
+Runs uvicorn with one process per worker. Each process builds its own
+engine pool sized from WEB_CONCURRENCY (see app.supabase); startup fails if
+that would exceed the Postgres connection budget. On SIGTERM
+uvicorn stops accepting connections and lets in-flight requests finish for
+up to GRACEFUL_TIMEOUT seconds before the app shuts down.
+"""
+
+import os
+import uvicorn
+
+
+def main():
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    # Worker processes inherit this and size their connection pools from it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    # Fail here, before spawning anything, if the Postgres budget can't fit
+    from app.supabase import request_pool_size
+
+    pool_size = request_pool_size(workers)
+    print(f"[SERVE] {workers} workers, {pool_size} request connections each")
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        proxy_headers=True,
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# Services package initialization file
+from .outbox import (
+    enqueue_receipt_email,
+    outbox_worker,
+    OUTBOX_CHANNEL,
+    RECEIPT_EMAIL_ENABLED,
+)
+from .order_totals import (
+    lock_order,
+    lock_order_for_item,
+    recalculate_order_totals,
+)
+from .notifications import pg_listener
+
+__all__ = [
+    "enqueue_receipt_email",
+    "outbox_worker",
+    "OUTBOX_CHANNEL",
+    "RECEIPT_EMAIL_ENABLED",
+    "lock_order",
+    "lock_order_for_item",
+    "recalculate_order_totals",
+    "pg_listener",
+]
@@ -0,0 +1,27 @@
+import os
+import smtplib
+from email.message import EmailMessage
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# SMTP settings. For local testing run a stand-in server with
+#   python -m aiosmtpd -n -l localhost:1025
+# and set SMTP_HOST=localhost, SMTP_PORT=1025, SMTP_USE_TLS=false.
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "15"))
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER or "no-reply@localhost")
+
+
+def send_email(message: EmailMessage) -> None:
+    """Blocking SMTP send; the outbox worker runs this in a thread"""
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT) as smtp:
+        if SMTP_USE_TLS:
+            smtp.starttls()
+        if SMTP_USER and SMTP_PASSWORD:
+            smtp.login(SMTP_USER, SMTP_PASSWORD)
+        smtp.send_message(message)
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Callable, Dict
+import asyncpg
+from app.supabase import LISTEN_DSN
+
+LISTEN_RETRY_MIN = 1.0
+LISTEN_RETRY_MAX = 60.0
+
+
+class PgListener:
+    """Fans Postgres ``NOTIFY`` messages out to callbacks in this process.
+
+    With several worker processes, anything that would otherwise be
+    per-process state (e.g. "the outbox has new rows") is signalled through
+    Postgres so every worker hears it. The ``LISTEN`` connection is opened
+    directly with asyncpg, outside the request pool, and is counted in the
+    per-process connection budget (see app.supabase).
+
+    If listening is not possible at startup (for instance behind a
+    transaction-mode pooler), ``start`` logs and returns False and callers
+    keep their polling fallback. If an established connection drops, it is
+    logged and re-opened with backoff; callbacks are invoked once after
+    reconnecting so nothing signalled while disconnected is missed.
+    """
+
+    def __init__(self, dsn=LISTEN_DSN):
+        self._dsn = dsn
+        self._callbacks: Dict[str, Callable[[str], None]] = {}
+        self._connection = None
+        self._reconnect_task = None
+        self._stopping = False
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]):
+        """Register ``callback(payload)`` for ``channel``; call before start"""
+        self._callbacks[channel] = callback
+
+    async def start(self) -> bool:
+        if self._connection is not None or not self._callbacks:
+            return self._connection is not None
+        self._stopping = False
+        try:
+            await self._connect()
+            return True
+        except Exception as e:
+            print(f"[NOTIFY] LISTEN unavailable, falling back to polling: {str(e)}")
+            return False
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except asyncio.CancelledError:
+                pass
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            connection.remove_termination_listener(self._on_terminated)
+            try:
+                await connection.close()
+            except Exception:
+                pass
+
+    async def _connect(self):
+        connection = await asyncpg.connect(self._dsn)
+        try:
+            for channel in self._callbacks:
+                await connection.add_listener(channel, self._dispatch)
+        except Exception:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+        print(f"[NOTIFY] Listening on {', '.join(self._callbacks)}")
+
+    def _on_terminated(self, connection):
+        if self._stopping or connection is not self._connection:
+            return
+        self._connection = None
+        print("[NOTIFY] LISTEN connection lost, polling until it reconnects")
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect()
+            )
+
+    async def _reconnect(self):
+        delay = LISTEN_RETRY_MIN
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception as e:
+                print(f"[NOTIFY] Reconnect failed, retrying in {delay:.0f}s: {str(e)}")
+                delay = min(delay * 2, LISTEN_RETRY_MAX)
+                continue
+            # Catch up on anything signalled while we were disconnected
+            for callback in self._callbacks.values():
+                callback("")
+            return
+
+    def _dispatch(self, connection, pid, channel, payload):
+        callback = self._callbacks.get(channel)
+        if callback is not None:
+            callback(payload)
+
+
+pg_listener = PgListener()
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.order import Order, OrderItem
+
+# Pricing rules, kept in line with the POS frontend (usePOSOrder / page.tsx)
+VAT_RATE = 0.12
+STATUTORY_DISCOUNT_RATE = 0.20  # Senior citizen / PWD
+STATUTORY_DISCOUNT_TYPES = ["senior", "pwd"]
+
+
+async def lock_order(db: AsyncSession, order_id: int) -> bool:
+    """Take the parent order's row lock before changing any of its items.
+
+    Item writers must serialize on the order row *before* touching items.
+    Otherwise, under READ COMMITTED, a second writer that only blocks at the
+    totals UPDATE re-checks the order row but reuses its stale SUM snapshot
+    and overwrites the totals without the first writer's change. Returns
+    False if the order does not exist.
+    """
+    result = await db.execute(
+        select(Order.order_id).where(Order.order_id == order_id).with_for_update()
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def lock_order_for_item(db: AsyncSession, item_id: int) -> Optional[int]:
+    """``lock_order`` for the order owning ``item_id``, in one statement.
+
+    Returns the locked order's id, or ``None`` if the item does not exist.
+    """
+    result = await db.execute(
+        select(Order.order_id)
+        .join(OrderItem, OrderItem.order_id == Order.order_id)
+        .where(OrderItem.order_item_id == item_id)
+        .with_for_update(of=Order)
+    )
+    return result.scalar_one_or_none()
+
+
+async def recalculate_order_totals(db: AsyncSession, order_id: int) -> Optional[dict]:
+    """Recompute an order's money fields from its items in one statement.
+
+    Runs ``UPDATE orders ... FROM (SELECT SUM(total_price) ...)`` inside the
+    caller's transaction, which must already hold ``lock_order``. Discount
+    rules:
+
+    - Senior / PWD: 20% of the subtotal, stored in ``discount``
+    - anything else: ``discount`` is left as entered and only capped at the
+      subtotal when computing ``total_amount``, so a discount larger than the
+      current subtotal comes back in full once more items are added. The
+      percentage/fixed mode of a Special discount isn't stored, so
+      percentage discounts behave as the fixed amount they came to when
+      applied.
+
+    Returns the new totals, or ``None`` if the order does not exist.
+    """
+    # Ungrouped aggregate: always exactly one row, even for an order with no items
+    items = (
+        select(
+            literal(order_id).label("order_id"),
+            func.coalesce(func.sum(OrderItem.total_price), 0).label("subtotal"),
+        )
+        .where(OrderItem.order_id == order_id)
+        .subquery()
+    )
+    subtotal = items.c.subtotal
+    vat = subtotal * VAT_RATE
+    statutory = func.lower(Order.discount_type).in_(STATUTORY_DISCOUNT_TYPES)
+    discount = case(
+        (statutory, subtotal * STATUTORY_DISCOUNT_RATE),
+        else_=func.coalesce(Order.discount, 0),
+    )
+    applied_discount = case(
+        (statutory, subtotal * STATUTORY_DISCOUNT_RATE),
+        else_=func.least(func.coalesce(Order.discount, 0), subtotal),
+    )
+    result = await db.execute(
+        update(Order)
+        .where(Order.order_id == items.c.order_id)
+        .values(
+            subtotal=subtotal,
+            vat=vat,
+            discount=discount,
+            total_amount=subtotal + vat - applied_discount,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(
+            Order.order_id,
+            Order.subtotal,
+            Order.discount,
+            Order.vat,
+            Order.total_amount,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = result.mappings().first()
+    return dict(row) if row else None
@@ -0,0 +1,241 @@
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+from app.models.order import Outbox
+from app.supabase import BackgroundSessionLocal, RECEIPT_EMAIL_ENABLED
+from app.services.mailer import SMTP_FROM, send_email
+from app.services.receipts import render_receipt_email
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "4"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+# How long a claimed row stays reserved; a worker that dies mid-send leaves
+# the row in "sending" and another worker picks it up once this expires
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+RECEIPT_EMAIL = "receipt_email"
+# NOTIFY channel raised by the outbox insert trigger (Database/add_outbox_notify.sql)
+OUTBOX_CHANNEL = "outbox"
+
+
+def enqueue_receipt_email(db: AsyncSession, order, items) -> None:
+    """Queue a receipt for ``order`` in the caller's transaction.
+
+    Only adds a row to the session; nothing is rendered or sent here, so the
+    request pays for one extra INSERT and no SMTP round trip.
+    """
+    if not RECEIPT_EMAIL_ENABLED or not order.receipt_email:
+        return
+    created_at = order.created_at or datetime.utcnow()
+    db.add(
+        Outbox(
+            order_id=order.order_id,
+            event_type=RECEIPT_EMAIL,
+            recipient=order.receipt_email,
+            payload={
+                "order_id": order.order_id,
+                "created_at": created_at.strftime("%Y-%m-%d %H:%M"),
+                "customer_name": order.customer_name,
+                "order_type": order.order_type,
+                "subtotal": order.subtotal,
+                "discount": order.discount,
+                "vat": order.vat,
+                "total_amount": order.total_amount,
+                "payment_method": order.payment_method,
+                "amount_received": order.amount_received,
+                "change_amount": order.change_amount,
+                "customer_notes": order.customer_notes,
+                "order_items": [
+                    {
+                        "item_name": item.item_name,
+                        "quantity": item.quantity,
+                        "total_price": item.total_price,
+                    }
+                    for item in items
+                ],
+            },
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+    # Jitter so a burst of failures doesn't retry in lockstep
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class OutboxWorker:
+    """Background task that drains the ``outbox`` table.
+
+    Each pass claims a batch of due rows in a short transaction: the rows are
+    locked with ``FOR UPDATE SKIP LOCKED`` (so several workers never claim
+    the same row), marked ``sending`` with a lease of ``OUTBOX_LEASE_SECONDS``
+    and committed. Messages are then sent outside any transaction, with at
+    most ``OUTBOX_CONCURRENCY`` SMTP connections at a time, and each outcome
+    is recorded in its own short transaction. No database connection is held
+    while SMTP is in progress. Failed rows are retried with exponential
+    backoff until ``OUTBOX_MAX_ATTEMPTS`` is reached.
+
+    Between passes it sleeps for ``OUTBOX_POLL_INTERVAL`` unless ``wake`` is
+    called, which the Postgres ``NOTIFY outbox`` listener does so new receipts
+    go out without waiting for the next poll.
+    """
+
+    def __init__(self, session_factory=BackgroundSessionLocal, sender=send_email):
+        self._session_factory = session_factory
+        self._sender = sender
+        self._semaphore = asyncio.Semaphore(OUTBOX_CONCURRENCY)
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def wake(self, payload: str = ""):
+        """Run the next pass now instead of at the next poll"""
+        self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+            print("[OUTBOX] Worker started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            print("[OUTBOX] Worker stopped")
+
+    async def run_once(self) -> int:
+        """Deliver one batch; returns the number of rows processed"""
+        claimed = await self._claim()
+        await asyncio.gather(*(self._deliver(row) for row in claimed))
+        return len(claimed)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(Outbox)
+                .where(
+                    or_(Outbox.status == "pending", Outbox.status == "sending"),
+                    Outbox.next_attempt_at <= now,
+                )
+                .order_by(Outbox.next_attempt_at)
+                .limit(OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                await db.rollback()
+                return []
+            lease_until = now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            claimed = []
+            for row in rows:
+                if row.status == "sending":
+                    # Lease expired: the previous attempt crashed, hung or
+                    # couldn't record its outcome. Count it, so a message
+                    # that keeps killing the worker still hits the cap.
+                    row.attempts = (row.attempts or 0) + 1
+                    row.last_error = "Lease expired before delivery was recorded"
+                    if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+                        row.status = "failed"
+                        print(
+                            f"[OUTBOX] Delivery {row.outbox_id} failed "
+                            f"(attempt {row.attempts}/{OUTBOX_MAX_ATTEMPTS}): "
+                            f"{row.last_error}"
+                        )
+                        continue
+                row.status = "sending"
+                row.next_attempt_at = lease_until
+                claimed.append(
+                    {
+                        "outbox_id": row.outbox_id,
+                        "event_type": row.event_type,
+                        "recipient": row.recipient,
+                        "payload": row.payload,
+                        "attempts": row.attempts or 0,
+                    }
+                )
+            await db.commit()
+            return claimed
+
+    async def _deliver(self, row: dict):
+        async with self._semaphore:
+            try:
+                if row["event_type"] != RECEIPT_EMAIL:
+                    raise ValueError(
+                        f"Unknown outbox event type: {row['event_type']}"
+                    )
+                message = render_receipt_email(
+                    row["payload"], SMTP_FROM, row["recipient"]
+                )
+                await asyncio.to_thread(self._sender, message)
+                outcome = {
+                    "status": "sent",
+                    "sent_at": datetime.utcnow(),
+                    "last_error": None,
+                }
+            except Exception as e:
+                attempts = row["attempts"] + 1
+                outcome = {"attempts": attempts, "last_error": str(e)}
+                if attempts >= OUTBOX_MAX_ATTEMPTS:
+                    outcome["status"] = "failed"
+                else:
+                    outcome["status"] = "pending"
+                    outcome["next_attempt_at"] = datetime.utcnow() + _backoff(
+                        attempts
+                    )
+                print(
+                    f"[OUTBOX] Delivery {row['outbox_id']} failed "
+                    f"(attempt {attempts}/{OUTBOX_MAX_ATTEMPTS}): {str(e)}"
+                )
+        await self._record(row["outbox_id"], outcome)
+
+    async def _record(self, outbox_id: int, outcome: dict):
+        try:
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(Outbox)
+                    .where(
+                        Outbox.outbox_id == outbox_id, Outbox.status == "sending"
+                    )
+                    .values(**outcome)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            # The lease expires and the row is retried; log so it's visible
+            print(f"[OUTBOX] Could not record outcome for {outbox_id}: {str(e)}")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                print(f"[OUTBOX] Error while draining outbox: {str(e)}")
+                processed = 0
+            # A full batch means there is probably more work waiting
+            if processed >= OUTBOX_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+outbox_worker = OutboxWorker()
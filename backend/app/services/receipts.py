@@ -0,0 +1,74 @@
+from email.message import EmailMessage
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from string import Template
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    """Read and compile a receipt template once per process"""
+    return Template((TEMPLATE_DIR / name).read_text(encoding="utf-8"))
+
+
+def _money(value) -> str:
+    return f"PHP {float(value or 0):,.2f}"
+
+
+def _text_items(items) -> str:
+    return "\n".join(
+        f"{item['quantity']} x {item['item_name']:<24} {_money(item['total_price'])}"
+        for item in items
+    )
+
+
+def _html_items(items) -> str:
+    return "\n".join(
+        "      <tr>"
+        f"<td>{escape(str(item['item_name']))}</td>"
+        f"<td style=\"text-align: right;\">{item['quantity']}</td>"
+        f"<td style=\"text-align: right;\">{_money(item['total_price'])}</td>"
+        "</tr>"
+        for item in items
+    )
+
+
+def _context(payload: dict, html: bool) -> dict:
+    clean = (lambda v: escape(str(v))) if html else str
+    notes = payload.get("customer_notes") or ""
+    if notes:
+        notes = f"<p>Notes: {clean(notes)}</p>" if html else f"\nNotes: {notes}\n"
+    items = payload.get("order_items", [])
+    return {
+        "order_id": payload.get("order_id"),
+        "created_at": clean(payload.get("created_at") or ""),
+        "customer_name": clean(payload.get("customer_name") or "Walk-in Customer"),
+        "order_type": clean(payload.get("order_type") or ""),
+        "items": _html_items(items) if html else _text_items(items),
+        "subtotal": _money(payload.get("subtotal")),
+        "vat": _money(payload.get("vat")),
+        "discount": _money(payload.get("discount")),
+        "total_amount": _money(payload.get("total_amount")),
+        "payment_method": clean(payload.get("payment_method") or "cash"),
+        "amount_received": _money(payload.get("amount_received")),
+        "change_amount": _money(payload.get("change_amount")),
+        "customer_notes": notes,
+    }
+
+
+def render_receipt_email(payload: dict, sender: str, recipient: str) -> EmailMessage:
+    """Build a multipart (text + HTML) receipt from an outbox payload"""
+    message = EmailMessage()
+    message["Subject"] = f"Your receipt for Order #{payload.get('order_id')}"
+    message["From"] = sender
+    message["To"] = recipient
+    message.set_content(
+        load_template("receipt_email.txt").safe_substitute(_context(payload, False))
+    )
+    message.add_alternative(
+        load_template("receipt_email.html").safe_substitute(_context(payload, True)),
+        subtype="html",
+    )
+    return message
@@ -15,9 +15,78 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_API_KEY)
 
 # SQLAlchemy engine/session for direct Postgres access
 POSTGRES_URL = os.getenv("POSTGRES_URL")
-engine = create_async_engine(POSTGRES_URL, echo=False)
+
+# Receipt emails turn on per-process background work (see app.services.outbox)
+RECEIPT_EMAIL_ENABLED = os.getenv("RECEIPT_EMAIL_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Connection budget. Every worker process gets its own connections, so the
+# budget (PG_MAX_CONNECTIONS minus PG_RESERVED_CONNECTIONS for migrations,
+# the dashboard, etc.) is split evenly across WEB_CONCURRENCY processes.
+# Each process's share covers its request pool plus the connections it holds
+# for background work: one LISTEN connection and a single-connection pool
+# for the outbox worker. app.serve sets WEB_CONCURRENCY.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+PG_MAX_CONNECTIONS = int(os.getenv("PG_MAX_CONNECTIONS", "60"))
+PG_RESERVED_CONNECTIONS = int(os.getenv("PG_RESERVED_CONNECTIONS", "10"))
+PG_MIN_POOL_SIZE = int(os.getenv("PG_MIN_POOL_SIZE", "2"))
+BACKGROUND_CONNECTIONS = 2 if RECEIPT_EMAIL_ENABLED else 0
+
+
+def request_pool_size(workers: int) -> int:
+    """Request pool size per process for ``workers`` processes.
+
+    Raises RuntimeError when the budget can't give every process at least
+    PG_MIN_POOL_SIZE request connections on top of its background ones.
+    """
+    budget = PG_MAX_CONNECTIONS - PG_RESERVED_CONNECTIONS
+    pool_size = budget // workers - BACKGROUND_CONNECTIONS
+    if pool_size < PG_MIN_POOL_SIZE:
+        raise RuntimeError(
+            f"{workers} workers x ({PG_MIN_POOL_SIZE} request + "
+            f"{BACKGROUND_CONNECTIONS} background connections) exceeds the "
+            f"Postgres budget of {budget}; lower WEB_CONCURRENCY or raise "
+            f"PG_MAX_CONNECTIONS"
+        )
+    return pool_size
+
+
+POOL_SIZE = request_pool_size(WEB_CONCURRENCY)
+
+engine = create_async_engine(
+    POSTGRES_URL,
+    echo=False,
+    pool_size=POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=float(os.getenv("PG_POOL_TIMEOUT", "10")),
+    # Retire connections by age rather than pinging before every checkout,
+    # which would add a round trip to each request
+    pool_recycle=int(os.getenv("PG_POOL_RECYCLE", "1800")),
+)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Outbox worker gets its own single connection so it never competes with
+# requests for the request pool
+background_engine = create_async_engine(
+    POSTGRES_URL,
+    echo=False,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=60,
+    pool_pre_ping=True,
+)
+BackgroundSessionLocal = sessionmaker(
+    background_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Plain asyncpg DSN for the dedicated LISTEN connection
+LISTEN_DSN = engine.url.set(drivername="postgresql").render_as_string(
+    hide_password=False
+)
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
@@ -0,0 +1,159 @@
+"""Payload size / latency benchmark for the order list endpoints.
+
+Offline (no server needed): builds realistic order rows and compares the JSON
+size of the full response against ``fields=`` / ``include_items=`` projections,
+raw and compressed.
+
+    python benchmarks/bench_list_payloads.py
+
+Live: hits a running backend and reports wire bytes and latency per variant.
+
+    python benchmarks/bench_list_payloads.py --url http://localhost:8000 --runs 30
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LIST_FIELDS = (
+    "order_id,customer_name,order_type,total_amount,payment_method,"
+    "order_status,payment_status,created_at"
+)
+
+VARIANTS = [
+    ("full", {}),
+    ("fields", {"fields": LIST_FIELDS}),
+    ("fields, no items", {"fields": LIST_FIELDS, "include_items": "false"}),
+]
+
+
+def _sample_orders(count=50, items_per_order=4):
+    now = datetime(2025, 7, 1, 12, 0)
+    orders = []
+    for order_id in range(1, count + 1):
+        created_at = (now - timedelta(minutes=7 * order_id)).isoformat()
+        items = [
+            {
+                "order_item_id": order_id * 10 + n,
+                "order_id": order_id,
+                "item_name": ["Sisig Rice", "Beef Tapa", "Iced Tea", "Halo-Halo"][n % 4],
+                "price": 120.0 + n * 15,
+                "unit_price": 120.0 + n * 15,
+                "quantity": 1 + n % 3,
+                "total_price": (120.0 + n * 15) * (1 + n % 3),
+                "created_at": created_at,
+                "category": ["Rice Toppings", "Beverages", "Desserts"][n % 3],
+            }
+            for n in range(items_per_order)
+        ]
+        subtotal = sum(item["total_price"] for item in items)
+        orders.append(
+            {
+                "order_id": order_id,
+                "customer_name": f"Customer {order_id}",
+                "order_type": "Dining" if order_id % 2 else "Takeout",
+                "subtotal": subtotal,
+                "discount": subtotal * 0.2 if order_id % 5 == 0 else 0.0,
+                "discount_type": "Senior" if order_id % 5 == 0 else None,
+                "discount_value": 20.0 if order_id % 5 == 0 else None,
+                "discount_reason": "Senior citizen discount per RA 9994, ID verified at counter"
+                if order_id % 5 == 0
+                else None,
+                "discount_id_number": "123456" if order_id % 5 == 0 else None,
+                "vat": subtotal * 0.12,
+                "total_amount": subtotal * 1.12,
+                "payment_method": "cash" if order_id % 3 else "gcash",
+                "payment_reference": f"GC{order_id:010d}" if order_id % 3 == 0 else None,
+                "amount_received": 2000.0,
+                "change_amount": 2000.0 - subtotal * 1.12,
+                "order_status": "completed",
+                "payment_status": "Paid",
+                "customer_notes": "No onions on the sisig please, extra rice, and bring the drinks first",
+                "receipt_email": f"customer{order_id}@example.com",
+                "created_at": created_at,
+                "updated_at": created_at,
+                "order_items": items,
+            }
+        )
+    return orders
+
+
+def _project(orders, params):
+    fields = params.get("fields")
+    include_items = params.get("include_items", "true") == "true"
+    projected = []
+    for order in orders:
+        names = fields.split(",") if fields else [k for k in order if k != "order_items"]
+        row = {name: order[name] for name in names}
+        if include_items:
+            row["order_items"] = order["order_items"]
+        projected.append(row)
+    return projected
+
+
+def _timed(fn, body, runs=50):
+    start = time.perf_counter()
+    for _ in range(runs):
+        out = fn(body)
+    return len(out), (time.perf_counter() - start) / runs * 1000
+
+
+def run_offline():
+    orders = _sample_orders()
+    print(f"{'variant':<18}{'raw':>10}{'gzip':>10}{'gzip ms':>10}{'br':>10}{'br ms':>10}")
+    for name, params in VARIANTS:
+        body = json.dumps(_project(orders, params), default=str).encode()
+        gz_size, gz_ms = _timed(lambda b: gzip.compress(b, compresslevel=6), body)
+        line = f"{name:<18}{len(body):>10}{gz_size:>10}{gz_ms:>10.2f}"
+        if brotli is not None:
+            br_size, br_ms = _timed(lambda b: brotli.compress(b, quality=4), body)
+            line += f"{br_size:>10}{br_ms:>10.2f}"
+        print(line)
+
+
+def run_live(url, runs):
+    import httpx
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    print(f"{'variant':<18}{'encoding':>10}{'bytes':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    with httpx.Client(base_url=url, timeout=30) as client:
+        for path in ["/api/orders-async/", "/api/orders-async/status/held"]:
+            print(path)
+            for name, params in VARIANTS:
+                for encoding in encodings:
+                    latencies = []
+                    wire_bytes = 0
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        response = client.get(
+                            path, params=params, headers={"Accept-Encoding": encoding}
+                        )
+                        response.read()
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        wire_bytes = response.num_bytes_downloaded
+                        response.raise_for_status()
+                    latencies.sort()
+                    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+                    print(
+                        f"{name:<18}{encoding:>10}{wire_bytes:>10}"
+                        f"{statistics.median(latencies):>10.1f}{p95:>10.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running backend")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    if args.url:
+        run_live(args.url, args.runs)
+    else:
+        run_offline()
@@ -0,0 +1,111 @@
+"""Throughput benchmark for the multi-worker deployment mode.
+
+Starts ``python -m app.serve`` with 1..N worker processes and drives it with
+several load-generating client processes, reporting requests/s and latency
+for each worker count. Run from ``backend/`` with the usual ``.env``:
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --duration 10
+    python benchmarks/bench_workers.py --path "/api/orders-async/?fields=order_id,total_amount&include_items=false"
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def _client(url, duration, concurrency, queue):
+    async def run():
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        async with httpx.AsyncClient(timeout=30) as client:
+
+            async def worker():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        response.raise_for_status()
+                        latencies.append(time.perf_counter() - start)
+                    except Exception:
+                        errors += 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors
+
+    queue.put(asyncio.run(run()))
+
+
+def _wait_until_ready(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def bench(workers, args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(args.port))
+    env.setdefault("LOG_LEVEL", "warning")
+    server = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env)
+    try:
+        _wait_until_ready(base_url)
+        queue = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(
+                target=_client,
+                args=(base_url + args.path, args.duration, args.concurrency, queue),
+            )
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            client.start()
+        results = [queue.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = sum(result[1] for result in results)
+    if not latencies:
+        return workers, 0.0, 0.0, 0.0, errors
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    return (
+        workers,
+        len(latencies) / args.duration,
+        statistics.median(latencies) * 1000,
+        p99 * 1000,
+        errors,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for count in args.workers:
+        workers, rps, p50, p99, errors = bench(count, args)
+        print(f"{workers:>8}{rps:>10.0f}{p50:>10.1f}{p99:>10.1f}{errors:>8}")
@@ -0,0 +1,212 @@
+import gzip
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from app.models.order import Base, Order, OrderItem
+from app.routes.order_routes_async import _order_columns, router
+from app.supabase import get_db
+
+ORDER_COLUMNS = {column.name for column in Order.__table__.c}
+ITEM_COLUMNS = {column.name for column in OrderItem.__table__.c}
+
+
+@pytest.fixture
+def client(tmp_path):
+    db_path = tmp_path / "orders.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as db:
+        for n, status in enumerate(["completed", "held", "held"], start=1):
+            order = Order(
+                customer_name=f"Customer {n}",
+                order_type="Dining",
+                subtotal=100.0,
+                vat=12.0,
+                total_amount=112.0,
+                order_status=status,
+                customer_notes="No onions",
+                receipt_email=f"c{n}@example.com",
+                created_at=datetime(2025, 7, 1, 12, n),
+            )
+            db.add(order)
+            db.flush()
+            db.add(
+                OrderItem(
+                    order_id=order.order_id,
+                    item_name="Sisig",
+                    price=100.0,
+                    unit_price=100.0,
+                    quantity=1,
+                    total_price=100.0,
+                )
+            )
+        db.commit()
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _compiled(fields):
+    return str(select(*_order_columns(fields)).compile(dialect=postgresql.dialect()))
+
+
+def test_unknown_field_is_400(client):
+    with pytest.raises(HTTPException) as excinfo:
+        _order_columns("order_id,not_a_column")
+    assert excinfo.value.status_code == 400
+
+    response = client.get("/api/orders-async/", params={"fields": "not_a_column"})
+    assert response.status_code == 400
+    assert "not_a_column" in response.json()["detail"]
+
+
+def test_fields_narrow_the_select_and_keep_order_id():
+    sql = _compiled("customer_name, total_amount")
+
+    assert sql.startswith(
+        "SELECT orders.order_id, orders.customer_name, orders.total_amount \nFROM orders"
+    )
+    assert "customer_notes" not in sql
+    assert "receipt_email" not in sql
+
+
+def test_blank_fields_select_every_column():
+    assert _order_columns(" , ") == list(Order.__table__.c)
+    assert _order_columns(None) == list(Order.__table__.c)
+
+
+def test_default_response_keeps_full_shape(client):
+    orders = client.get("/api/orders-async/").json()
+
+    assert len(orders) == 3
+    for order in orders:
+        assert set(order) == ORDER_COLUMNS | {"order_items"}
+        assert len(order["order_items"]) == 1
+        assert set(order["order_items"][0]) == ITEM_COLUMNS
+        assert order["order_items"][0]["order_id"] == order["order_id"]
+
+
+def test_projection_and_include_items(client):
+    orders = client.get(
+        "/api/orders-async/",
+        params={"fields": "customer_name,total_amount", "include_items": "false"},
+    ).json()
+    held = client.get(
+        "/api/orders-async/status/held", params={"fields": "order_status"}
+    ).json()
+
+    assert [set(order) for order in orders] == [
+        {"order_id", "customer_name", "total_amount"}
+    ] * 3
+    assert len(held) == 2
+    for order in held:
+        assert set(order) == {"order_id", "order_status", "order_items"}
+        assert order["order_status"] == "held"
+        assert len(order["order_items"]) == 1
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("br", "br"),
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, br;q=0.1", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    pytest.importorskip("brotli")
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_negotiate_falls_back_to_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    assert negotiate_encoding("br, gzip") == "gzip"
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("*") == "gzip"
+
+
+@pytest.fixture
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return [{"item_name": "Sisig Rice", "n": n} for n in range(200)]
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_compressed_response_headers(compressed_client):
+    response = compressed_client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # Content-Length is the compressed size actually sent on the wire
+    assert int(response.headers["content-length"]) == response.num_bytes_downloaded
+    assert response.num_bytes_downloaded < len(response.content)
+    assert len(response.json()) == 200
+
+
+def test_brotli_response(compressed_client):
+    pytest.importorskip("brotli")
+    response = compressed_client.get("/big", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == response.num_bytes_downloaded
+    assert len(response.json()) == 200
+
+
+def test_identity_is_not_compressed(compressed_client):
+    response = compressed_client.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_small_response_is_not_compressed_but_varies(compressed_client):
+    response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"ok": True}
+
+
+def test_gzip_body_round_trips():
+    body = b'{"order_id": 1}' * 200
+    middleware = CompressionMiddleware(app=None)
+
+    assert gzip.decompress(middleware.compress(body, "gzip")) == body
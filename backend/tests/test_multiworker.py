@@ -0,0 +1,81 @@
+import asyncio
+
+import asyncpg
+import pytest
+
+from app import supabase
+from app.services.notifications import PgListener
+
+
+def _asyncpg_dsn(url):
+    return url.replace("postgresql+asyncpg://", "postgresql://")
+
+
+def test_pool_size_leaves_room_for_background_connections(monkeypatch):
+    monkeypatch.setattr(supabase, "PG_MAX_CONNECTIONS", 60)
+    monkeypatch.setattr(supabase, "PG_RESERVED_CONNECTIONS", 10)
+    monkeypatch.setattr(supabase, "BACKGROUND_CONNECTIONS", 2)
+
+    for workers in (1, 2, 4, 8):
+        pool_size = supabase.request_pool_size(workers)
+        assert workers * (pool_size + 2) <= 50
+
+    assert supabase.request_pool_size(4) == 10
+
+
+def test_pool_budget_that_cannot_be_met_fails(monkeypatch):
+    monkeypatch.setattr(supabase, "PG_MAX_CONNECTIONS", 60)
+    monkeypatch.setattr(supabase, "PG_RESERVED_CONNECTIONS", 10)
+    monkeypatch.setattr(supabase, "BACKGROUND_CONNECTIONS", 2)
+    monkeypatch.setattr(supabase, "PG_MIN_POOL_SIZE", 2)
+
+    with pytest.raises(RuntimeError):
+        supabase.request_pool_size(13)
+
+
+def test_listener_reconnects_after_connection_drops(postgres_url, monkeypatch):
+    monkeypatch.setattr("app.services.notifications.LISTEN_RETRY_MIN", 0.05)
+    dsn = _asyncpg_dsn(postgres_url)
+
+    async def scenario():
+        received = []
+        woken = asyncio.Event()
+
+        def on_notify(payload):
+            received.append(payload)
+            woken.set()
+
+        listener = PgListener(dsn=dsn)
+        listener.subscribe("outbox", on_notify)
+        assert await listener.start()
+
+        admin = await asyncpg.connect(dsn)
+        await admin.execute("NOTIFY outbox, 'first'")
+        await asyncio.wait_for(woken.wait(), timeout=5)
+
+        # Kill the LISTEN backend; the listener should reconnect on its own
+        await admin.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE query LIKE 'LISTEN%' AND pid <> pg_backend_pid()"
+        )
+        woken.clear()
+        # The catch-up callback after reconnecting wakes us with ""
+        await asyncio.wait_for(woken.wait(), timeout=5)
+        woken.clear()
+        await admin.execute("NOTIFY outbox, 'second'")
+        await asyncio.wait_for(woken.wait(), timeout=5)
+
+        await admin.close()
+        await listener.stop()
+        return received
+
+    assert asyncio.run(scenario()) == ["first", "", "second"]
+
+
+def test_listener_falls_back_to_polling_when_unavailable():
+    async def scenario():
+        listener = PgListener(dsn="postgresql://nobody@127.0.0.1:1/none")
+        listener.subscribe("outbox", lambda payload: None)
+        return await listener.start()
+
+    assert asyncio.run(scenario()) is False
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.order import Base, Order, OrderItem
+from app.routes.order_item_routes import (
+    OrderItemCreate,
+    OrderItemUpdate,
+    create_order_item,
+    delete_order_item,
+    update_order_item,
+)
+
+
+async def _setup(url, subtotals, **order_values):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        order = Order(order_status="held", subtotal=0, vat=0, **order_values)
+        db.add(order)
+        await db.flush()
+        items = [
+            OrderItem(
+                order_id=order.order_id,
+                item_name=f"Item {n}",
+                price=total,
+                unit_price=total,
+                quantity=1,
+                total_price=total,
+            )
+            for n, total in enumerate(subtotals)
+        ]
+        db.add_all(items)
+        await db.commit()
+        return engine, session_factory, order.order_id, [i.order_item_id for i in items]
+
+
+async def _order(session_factory, order_id):
+    async with session_factory() as db:
+        return await db.get(Order, order_id)
+
+
+class GatedSession:
+    """Session proxy that parks in ``commit`` until released, holding locks"""
+
+    def __init__(self, session):
+        self._session = session
+        self.reached_commit = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def commit(self):
+        self.reached_commit.set()
+        await self.release.wait()
+        await self._session.commit()
+
+
+def test_interleaved_item_edits_keep_totals_correct(postgres_url):
+    async def scenario():
+        engine, session_factory, order_id, (first, second) = await _setup(
+            postgres_url, [100.0, 100.0]
+        )
+        async with session_factory() as db1, session_factory() as db2:
+            gated = GatedSession(db1)
+            edit_one = asyncio.create_task(
+                update_order_item(first, OrderItemUpdate(total_price=300.0), gated)
+            )
+            await gated.reached_commit.wait()
+            edit_two = asyncio.create_task(
+                update_order_item(second, OrderItemUpdate(total_price=500.0), db2)
+            )
+            await asyncio.sleep(0.3)
+            # The second edit waits on the order row lock held by the first
+            blocked = not edit_two.done()
+            gated.release.set()
+            await asyncio.gather(edit_one, edit_two)
+        order = await _order(session_factory, order_id)
+        await engine.dispose()
+        return blocked, order
+
+    blocked, order = asyncio.run(scenario())
+
+    assert blocked
+    assert order.subtotal == pytest.approx(800.0)
+    assert order.vat == pytest.approx(96.0)
+    assert order.total_amount == pytest.approx(896.0)
+
+
+def test_item_writes_return_recomputed_totals(postgres_url):
+    async def scenario():
+        engine, session_factory, order_id, (first,) = await _setup(
+            postgres_url, [100.0]
+        )
+        async with session_factory() as db:
+            created = await create_order_item(
+                OrderItemCreate(
+                    order_id=order_id,
+                    item_name="Iced Tea",
+                    unit_price=50.0,
+                    quantity=2,
+                    total_price=100.0,
+                ),
+                db,
+            )
+        async with session_factory() as db:
+            updated = await update_order_item(first, OrderItemUpdate(quantity=3), db)
+        async with session_factory() as db:
+            deleted = await delete_order_item(created["order_item_id"], db)
+        await engine.dispose()
+        return created, updated, deleted
+
+    created, updated, deleted = asyncio.run(scenario())
+
+    assert created["order_totals"]["subtotal"] == pytest.approx(200.0)
+    assert updated["total_price"] == pytest.approx(300.0)
+    assert updated["order_totals"]["subtotal"] == pytest.approx(400.0)
+    assert deleted["order_totals"]["subtotal"] == pytest.approx(300.0)
+    assert deleted["order_totals"]["total_amount"] == pytest.approx(336.0)
+
+
+def test_fixed_discount_is_capped_without_losing_the_amount(postgres_url):
+    async def scenario():
+        engine, session_factory, order_id, (first,) = await _setup(
+            postgres_url, [150.0], discount=200.0, discount_type="Special"
+        )
+        async with session_factory() as db:
+            small = await update_order_item(first, OrderItemUpdate(total_price=150.0), db)
+        async with session_factory() as db:
+            large = await update_order_item(first, OrderItemUpdate(total_price=300.0), db)
+        await engine.dispose()
+        return small["order_totals"], large["order_totals"]
+
+    small, large = asyncio.run(scenario())
+
+    assert small["discount"] == pytest.approx(200.0)
+    assert small["total_amount"] == pytest.approx(150.0 * 1.12 - 150.0)
+    assert large["discount"] == pytest.approx(200.0)
+    assert large["total_amount"] == pytest.approx(300.0 * 1.12 - 200.0)
+
+
+def test_senior_discount_follows_subtotal(postgres_url):
+    async def scenario():
+        engine, session_factory, order_id, (first,) = await _setup(
+            postgres_url, [100.0], discount=20.0, discount_type="Senior"
+        )
+        async with session_factory() as db:
+            result = await update_order_item(
+                first, OrderItemUpdate(total_price=250.0), db
+            )
+        await engine.dispose()
+        return result["order_totals"]
+
+    totals = asyncio.run(scenario())
+
+    assert totals["discount"] == pytest.approx(50.0)
+    assert totals["total_amount"] == pytest.approx(250.0 * 1.12 - 50.0)
+
+
+def test_missing_item_is_404(postgres_url):
+    from fastapi import HTTPException
+
+    async def scenario():
+        engine, session_factory, _, _ = await _setup(postgres_url, [100.0])
+        try:
+            async with session_factory() as db:
+                with pytest.raises(HTTPException) as excinfo:
+                    await delete_order_item(9999, db)
+            return excinfo.value.status_code
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == 404
+
+
+def test_delete_locks_deletes_and_recomputes_in_three_statements(postgres_url):
+    from sqlalchemy import event
+
+    async def scenario():
+        engine, session_factory, _, (first, _second) = await _setup(
+            postgres_url, [100.0, 50.0]
+        )
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        async with session_factory() as db:
+            result = await delete_order_item(first, db)
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+        await engine.dispose()
+        return statements, result
+
+    statements, result = asyncio.run(scenario())
+
+    assert len(statements) == 3
+    assert "FOR UPDATE OF orders" in statements[0]
+    assert statements[1].startswith("DELETE FROM order_items")
+    assert statements[2].startswith("UPDATE orders")
+    assert result["order_totals"]["subtotal"] == pytest.approx(50.0)
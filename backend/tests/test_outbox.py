@@ -0,0 +1,251 @@
+import asyncio
+import socket
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.order import Base, Order, Outbox
+from app.routes.order_routes_async import OrderCreate, create_order_async
+from app.services import mailer, outbox
+from app.services.outbox import OutboxWorker
+
+SMTP_DELAY = 0.3
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps messages and bounces ``bounce@`` addresses"""
+
+    def __init__(self, delay=0.0):
+        self.messages = []
+        self.delay = delay
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bounce@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _smtp(monkeypatch, handler):
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(mailer, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(mailer, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(mailer, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(mailer, "SMTP_USER", None)
+    return controller
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    controller = _smtp(monkeypatch, handler)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def slow_smtp_server(monkeypatch):
+    handler = RecordingHandler(delay=SMTP_DELAY)
+    controller = _smtp(monkeypatch, handler)
+    yield handler
+    controller.stop()
+
+
+async def _session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _add_row(session_factory, **values):
+    row = Outbox(
+        event_type=outbox.RECEIPT_EMAIL,
+        recipient=values.pop("recipient", "customer@example.com"),
+        payload={"order_id": 7, "order_items": [], "total_amount": 100},
+        status=values.pop("status", "pending"),
+        attempts=values.pop("attempts", 0),
+        next_attempt_at=values.pop("next_attempt_at", datetime.utcnow()),
+    )
+    async with session_factory() as db:
+        db.add(row)
+        await db.commit()
+        return row.outbox_id
+
+
+async def _get_row(session_factory, outbox_id):
+    async with session_factory() as db:
+        return await db.get(Outbox, outbox_id)
+
+
+def test_delivers_pending_receipt(tmp_path, smtp_server):
+    async def scenario():
+        engine, session_factory = await _session_factory(tmp_path)
+        outbox_id = await _add_row(session_factory)
+        processed = await OutboxWorker(session_factory=session_factory).run_once()
+        row = await _get_row(session_factory, outbox_id)
+        await engine.dispose()
+        return processed, row
+
+    processed, row = asyncio.run(scenario())
+
+    assert processed == 1
+    assert row.status == "sent"
+    assert row.sent_at is not None
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.messages[0].rcpt_tos == ["customer@example.com"]
+    assert b"Order #7" in smtp_server.messages[0].content
+
+
+def test_failed_delivery_backs_off(tmp_path, smtp_server):
+    async def scenario():
+        engine, session_factory = await _session_factory(tmp_path)
+        outbox_id = await _add_row(session_factory, recipient="bounce@example.com")
+        worker = OutboxWorker(session_factory=session_factory)
+        first = await worker.run_once()
+        # Not due again until the backoff has passed
+        second = await worker.run_once()
+        row = await _get_row(session_factory, outbox_id)
+        await engine.dispose()
+        return first, second, row
+
+    first, second, row = asyncio.run(scenario())
+
+    assert (first, second) == (1, 0)
+    assert row.status == "pending"
+    assert row.attempts == 1
+    assert row.last_error
+    assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    assert smtp_server.messages == []
+
+
+def test_gives_up_after_max_attempts(tmp_path, smtp_server, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 3)
+
+    async def scenario():
+        engine, session_factory = await _session_factory(tmp_path)
+        outbox_id = await _add_row(
+            session_factory, recipient="bounce@example.com", attempts=2
+        )
+        await OutboxWorker(session_factory=session_factory).run_once()
+        row = await _get_row(session_factory, outbox_id)
+        await engine.dispose()
+        return row
+
+    row = asyncio.run(scenario())
+
+    assert row.status == "failed"
+    assert row.attempts == 3
+
+
+def test_expired_lease_is_reclaimed(tmp_path, smtp_server, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 3)
+
+    async def scenario():
+        engine, session_factory = await _session_factory(tmp_path)
+        leased = await _add_row(
+            session_factory,
+            status="sending",
+            next_attempt_at=datetime.utcnow() + timedelta(minutes=5),
+        )
+        expired = await _add_row(
+            session_factory,
+            status="sending",
+            next_attempt_at=datetime.utcnow() - timedelta(seconds=1),
+        )
+        # Already crashed the worker twice; the third expired lease is the cap
+        poison = await _add_row(
+            session_factory,
+            recipient="poison@example.com",
+            status="sending",
+            attempts=2,
+            next_attempt_at=datetime.utcnow() - timedelta(seconds=1),
+        )
+        processed = await OutboxWorker(session_factory=session_factory).run_once()
+        rows = [
+            await _get_row(session_factory, i) for i in (leased, expired, poison)
+        ]
+        await engine.dispose()
+        return processed, rows
+
+    processed, (leased, expired, poison) = asyncio.run(scenario())
+
+    assert processed == 1
+    assert leased.status == "sending"
+    assert expired.status == "sent"
+    assert expired.attempts == 1
+    assert poison.status == "failed"
+    assert poison.attempts == 3
+    assert "Lease expired" in poison.last_error
+    assert [m.rcpt_tos for m in smtp_server.messages] == [["customer@example.com"]]
+
+
+def _p99(samples):
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * 0.99) - 1)]
+
+
+def test_checkout_latency_unchanged_with_email_enabled(
+    tmp_path, slow_smtp_server, monkeypatch
+):
+    order_data = OrderCreate(
+        vat=12.0,
+        subtotal=100.0,
+        total_amount=112.0,
+        payment_method="cash",
+        receipt_email="customer@example.com",
+        order_items=[
+            {"item_name": "Sisig", "unit_price": 100.0, "quantity": 1, "total_price": 100.0}
+        ],
+    )
+
+    async def checkouts(session_factory, count=60):
+        latencies = []
+        for _ in range(count):
+            async with session_factory() as db:
+                start = time.perf_counter()
+                await create_order_async(order_data, db)
+                latencies.append(time.perf_counter() - start)
+        return latencies
+
+    async def scenario():
+        engine, session_factory = await _session_factory(tmp_path)
+        monkeypatch.setattr(outbox, "RECEIPT_EMAIL_ENABLED", False)
+        disabled = await checkouts(session_factory)
+        monkeypatch.setattr(outbox, "RECEIPT_EMAIL_ENABLED", True)
+        enabled = await checkouts(session_factory)
+        async with session_factory() as db:
+            queued = (await db.execute(select(Outbox))).scalars().all()
+            orders = (await db.execute(select(Order))).scalars().all()
+        await engine.dispose()
+        return disabled, enabled, queued, orders
+
+    disabled, enabled, queued, orders = asyncio.run(scenario())
+    p99_disabled, p99_enabled = _p99(disabled), _p99(enabled)
+    print(
+        f"checkout p99: email off {p99_disabled * 1000:.1f} ms, "
+        f"email on {p99_enabled * 1000:.1f} ms"
+    )
+
+    assert len(orders) == 120
+    assert len(queued) == 60
+    # Nothing is sent on the request path: the slow SMTP stand-in is untouched
+    assert slow_smtp_server.messages == []
+    assert p99_enabled < SMTP_DELAY
+    assert p99_enabled <= p99_disabled * 2 + 0.02